@@ -18,30 +18,89 @@ import logging
 import logging.handlers
 import configparser
 import smtplib
-import subprocess
-import shutil
-import tempfile
 import argparse
-from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from pathlib import Path
-import psutil
+import atexit
+import errno
+import json
+import mmap
+import queue
+import select
+import socket
+import struct
+import threading
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formatdate
+
+
+# Size of the read/write probe payload; one block, as required by O_DIRECT
+PROBE_BLOCK_SIZE = 4096
+
+# The probe block starts with an 8-byte nonce followed by a fixed marker
+PROBE_NONCE_SIZE = 8
+PROBE_MARKER = b"Plex mount health check"
+
+LEVEL_MAP = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line for structured log collectors."""
+    
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+        }
+        payload = getattr(record, 'payload', None)
+        if payload is not None:
+            entry.update(payload)
+        else:
+            entry['message'] = record.getMessage()
+        return json.dumps(entry)
 
 
 class PlexMountHealthChecker:
     def __init__(self, config_file='plex_mount_health.conf'):
         """Initialize the mount health checker with configuration."""
         self.config_file = config_file
+        self.hostname = os.uname().nodename
         self.config = configparser.ConfigParser()
         self.logger = None
+        # Send times are time.monotonic() values, immune to wall-clock jumps
         self.last_email_sent = None
         self.last_test_email_sent = None
         self.consecutive_failures = 0
+        self._smtp = None
+        self._mount_probe = None
+        self._tasks = {}
+        self._log_listener = None
+        
+        # Read/write probe buffers, allocated once; O_DIRECT needs block-aligned
+        # buffers and anonymous mmaps are page aligned
+        self._probe_buf = mmap.mmap(-1, PROBE_BLOCK_SIZE)
+        self._probe_buf[PROBE_NONCE_SIZE:PROBE_NONCE_SIZE + len(PROBE_MARKER)] = PROBE_MARKER
+        self._probe_read_buf = mmap.mmap(-1, PROBE_BLOCK_SIZE)
+        self._probe_lock = threading.Lock()
+        
+        atexit.register(self._close_smtp)
+        atexit.register(self._stop_log_listener)
         
         # Load configuration
         self.load_config()
         self.setup_logging()
+        self._load_state()
+        
+        # Bind the variants selected by configuration once, instead of
+        # re-checking the flags on every call
+        self.perform_read_write_test = self._rw_test_dryrun if self.dry_run else self._rw_test_real
+        self.send_email_alert = self._send_email_enabled if self.email_enabled else self._send_email_disabled
         
     def load_config(self):
         """Load configuration from the config file."""
@@ -61,6 +120,39 @@ class PlexMountHealthChecker:
             if section not in self.config:
                 print(f"ERROR: Missing required section '{section}' in config file")
                 sys.exit(1)
+        
+        self._load_settings()
+    
+    def _load_settings(self):
+        """Parse frequently used configuration values once into typed attributes."""
+        # Mount settings
+        self.mount_path = self.get_config_value('Mount Settings', 'mount_path')
+        self.test_file = self.get_config_value('Mount Settings', 'test_file', 'health_check.tmp')
+        self.check_interval = self.get_config_value('Mount Settings', 'check_interval', 300, int)
+        self.mount_timeout = self.get_config_value('Mount Settings', 'mount_timeout', 30, int)
+        self.min_free_space_mb = self.get_config_value('Mount Settings', 'min_free_space_mb', 100, int)
+        
+        # Script behavior
+        self.debug = self.get_config_value('Script Behavior', 'debug', False, bool)
+        self.dry_run = self.get_config_value('Script Behavior', 'dry_run', False, bool)
+        self.max_failures = self.get_config_value('Script Behavior', 'max_failures', 3, int)
+        self.email_cooldown = self.get_config_value('Script Behavior', 'email_cooldown', 3600, int)
+        self.state_file = self.get_config_value('Script Behavior', 'state_file', '')
+        
+        # Email settings
+        self.email_enabled = self.get_config_value('Email Settings', 'email_enabled', True, bool)
+        self.smtp_timeout = self.get_config_value('Email Settings', 'smtp_timeout', 10, int)
+        self.from_email = self.get_config_value('Email Settings', 'from_email', '')
+        self.to_emails = self.get_config_value('Email Settings', 'to_emails', '')
+        self.email_subject_prefix = self.get_config_value('Email Settings', 'email_subject_prefix', '[Plex Mount Alert]')
+        
+        # Email test settings
+        self.send_test_email_on_startup = self.get_config_value('Email Test Settings', 'send_test_email_on_startup', False, bool)
+        self.test_email_interval_hours = self.get_config_value('Email Test Settings', 'test_email_interval_hours', 0, int)
+        
+        # Advanced settings
+        critical_dirs = self.get_config_value('Advanced Settings', 'critical_directories', '')
+        self.critical_dirs_list = tuple(d.strip() for d in critical_dirs.split(',') if d.strip())
     
     def get_config_value(self, section, key, default=None, value_type=str):
         """Get configuration value with type conversion and default fallback."""
@@ -84,6 +176,7 @@ class PlexMountHealthChecker:
         log_level = self.get_config_value('Logging', 'log_level', 'INFO')
         max_log_size = self.get_config_value('Logging', 'max_log_size', 10, int) * 1024 * 1024  # Convert MB to bytes
         log_backup_count = self.get_config_value('Logging', 'log_backup_count', 5, int)
+        log_format = self.get_config_value('Logging', 'log_format', 'text')
         
         # Create log directory if it doesn't exist
         log_dir = os.path.dirname(log_path)
@@ -102,105 +195,285 @@ class PlexMountHealthChecker:
         file_handler = logging.handlers.RotatingFileHandler(
             log_path, maxBytes=max_log_size, backupCount=log_backup_count
         )
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        if log_format.lower() == 'json':
+            file_formatter = JsonFormatter()
+        else:
+            file_formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
         
-        # Console handler for debug mode
-        if self.get_config_value('Script Behavior', 'debug', False, bool):
-            console_handler = logging.StreamHandler()
-            console_formatter = logging.Formatter('%(levelname)s - %(message)s')
-            console_handler.setFormatter(console_formatter)
-            self.logger.addHandler(console_handler)
+        # Hand records to a background thread so a slow or failing log disk
+        # never blocks the check loop
+        log_queue = queue.Queue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        if self._log_listener is not None:
+            self._log_listener.stop()
+        self._log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        self._log_listener.start()
+        
+        # Console handler, silenced unless in debug mode
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.DEBUG if self.debug else logging.CRITICAL + 1)
+        console_formatter = logging.Formatter('%(levelname)s - %(message)s')
+        console_handler.setFormatter(console_formatter)
+        self.logger.addHandler(console_handler)
+    
+    def _stop_log_listener(self):
+        """Flush queued log records to disk and stop the background writer."""
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+    
+    def _load_state(self):
+        """Restore failure count and email send times saved by a previous run."""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        
+        # Sent times are persisted as wall-clock timestamps; convert them back to
+        # monotonic values once here, treating timestamps in the future as "now"
+        now_wall = time.time()
+        now_mono = time.monotonic()
+        
+        def to_monotonic(wall):
+            if wall is None:
+                return None
+            return now_mono - max(0.0, now_wall - float(wall))
+        
+        # A corrupt or unexpected state file must never stop monitoring; fall
+        # back to the defaults instead
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if not isinstance(state, dict):
+                raise ValueError("expected a JSON object")
+            
+            consecutive_failures = int(state.get('consecutive_failures', 0))
+            last_email_sent = to_monotonic(state.get('last_email_sent'))
+            last_test_email_sent = to_monotonic(state.get('last_test_email_sent'))
+        except Exception as e:
+            self.log_and_print('warning', "Ignoring unreadable state file '%s': %s", self.state_file, e)
+            return
+        
+        self.consecutive_failures = max(0, consecutive_failures)
+        self.last_email_sent = last_email_sent
+        self.last_test_email_sent = last_test_email_sent
+    
+    def _save_state(self):
+        """Atomically persist failure count and email send times to the state file."""
+        if not self.state_file or self.dry_run:
+            return
+        
+        now_wall = time.time()
+        now_mono = time.monotonic()
+        
+        def to_wall(mono):
+            if mono is None:
+                return None
+            return now_wall - (now_mono - mono)
+        
+        state = {
+            'consecutive_failures': self.consecutive_failures,
+            'last_email_sent': to_wall(self.last_email_sent),
+            'last_test_email_sent': to_wall(self.last_test_email_sent),
+        }
+        
+        tmp_path = f"{self.state_file}.tmp"
+        try:
+            state_dir = os.path.dirname(self.state_file)
+            if state_dir and not os.path.exists(state_dir):
+                os.makedirs(state_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            self.log_and_print('warning', "Failed to write state file '%s': %s", self.state_file, e)
+    
+    def log_and_print(self, level, message, *args):
+        """Log message; the console handler echoes it in debug mode.
+        
+        Extra args are %-formatted lazily by logging, only if the record is emitted.
+        """
+        self.logger.log(LEVEL_MAP[level], message, *args)
+    
+    def _probe_mount(self, mount_path):
+        """statvfs the mount once, returning (result, None) or (None, error)."""
+        try:
+            return os.statvfs(mount_path), None
+        except OSError as e:
+            return None, e
     
-    def log_and_print(self, level, message):
-        """Log message and print if in debug mode."""
-        getattr(self.logger, level)(message)
-        if self.get_config_value('Script Behavior', 'debug', False, bool):
-            print(f"{level.upper()}: {message}")
+    def _get_mount_stats(self, mount_path):
+        """Return the statvfs probe shared by the checks of the current cycle."""
+        if self._mount_probe is None:
+            return self._probe_mount(mount_path)
+        return self._mount_probe.result()
     
     def check_mount_exists(self, mount_path):
         """Check if the mount point exists and is actually mounted."""
         try:
-            if not os.path.exists(mount_path):
+            stats, error = self._get_mount_stats(mount_path)
+            if isinstance(error, FileNotFoundError):
                 return False, f"Mount path '{mount_path}' does not exist"
+            if error is not None:
+                return False, f"Error checking mount: {str(error)}"
             
-            if not os.path.ismount(mount_path):
-                # Additional check using /proc/mounts
-                with open('/proc/mounts', 'r') as f:
-                    mounts = f.read()
-                    if mount_path not in mounts:
-                        return False, f"'{mount_path}' is not mounted"
+            if not os.path.ismount(mount_path) and not self._is_listed_mount_point(mount_path):
+                return False, f"'{mount_path}' is not mounted"
             
             return True, "Mount point exists and is mounted"
         except Exception as e:
             return False, f"Error checking mount: {str(e)}"
     
+    def _is_listed_mount_point(self, mount_path):
+        """Check /proc/self/mountinfo for an exact mount point match (catches bind mounts)."""
+        # The kernel escapes whitespace and backslashes in mount points as octal
+        target = os.path.realpath(mount_path)
+        for char, escaped in (('\\', '\\134'), (' ', '\\040'), ('\t', '\\011'), ('\n', '\\012')):
+            target = target.replace(char, escaped)
+        
+        try:
+            with open('/proc/self/mountinfo', 'r') as f:
+                for line in f:
+                    # Field 5 is the mount point
+                    fields = line.split(' ', 5)
+                    if len(fields) > 4 and fields[4] == target:
+                        return True
+        except OSError:
+            pass
+        return False
+    
     def check_mount_accessibility(self, mount_path):
         """Check if the mount is accessible (readable/writable)."""
         try:
-            # Check read access
-            if not os.access(mount_path, os.R_OK):
-                return False, f"Mount '{mount_path}' is not readable"
+            stats, error = self._get_mount_stats(mount_path)
+            if error is not None:
+                return False, f"Mount '{mount_path}' is not accessible: {str(error)}"
+            
+            if stats.f_flag & os.ST_RDONLY:
+                return False, f"Mount '{mount_path}' is mounted read-only"
             
-            # Check write access
-            if not os.access(mount_path, os.W_OK):
+            # Check read and write permissions together, only splitting them up on failure
+            if not os.access(mount_path, os.R_OK | os.W_OK):
+                if not os.access(mount_path, os.R_OK):
+                    return False, f"Mount '{mount_path}' is not readable"
                 return False, f"Mount '{mount_path}' is not writable"
             
+            free_mb = stats.f_bavail * stats.f_frsize // (1024 * 1024)
+            if free_mb < self.min_free_space_mb:
+                return False, f"Mount '{mount_path}' is almost full ({free_mb} MB free)"
+            
             return True, "Mount is accessible for read/write operations"
         except Exception as e:
             return False, f"Error checking mount accessibility: {str(e)}"
     
-    def perform_read_write_test(self, mount_path):
-        """Perform a read/write test on the mount."""
+    def _probe_paths(self, mount_path):
+        """Return the probe directory and a unique probe file name within it."""
         test_dir = os.path.join(mount_path, '.health_check')
-        test_file = self.get_config_value('Mount Settings', 'test_file', 'health_check.tmp')
-        test_file_path = os.path.join(test_dir, test_file)
+        # Unique name per probe so concurrent checkers sharing the mount never touch the same file
+        nonce = uuid.uuid4().hex
+        return test_dir, os.path.join(test_dir, f"{self.test_file}.{os.getpid()}.{nonce}")
+    
+    def _rw_test_real(self, mount_path):
+        """Perform a read/write test on the mount."""
+        test_dir, test_file_path = self._probe_paths(mount_path)
         
         try:
             # Create test directory if it doesn't exist
             if not os.path.exists(test_dir):
-                if not self.get_config_value('Script Behavior', 'dry_run', False, bool):
-                    os.makedirs(test_dir, exist_ok=True)
-                else:
-                    self.log_and_print('info', f"DRY RUN: Would create directory '{test_dir}'")
+                os.makedirs(test_dir, exist_ok=True)
             
-            # Write test
-            test_content = f"Health check test - {datetime.now().isoformat()}"
-            if not self.get_config_value('Script Behavior', 'dry_run', False, bool):
-                with open(test_file_path, 'w') as f:
-                    f.write(test_content)
-                
-                # Read test
-                with open(test_file_path, 'r') as f:
-                    read_content = f.read()
+            # The probe buffers are shared across cycles; a probe from an earlier
+            # cycle that is still stuck on the mount must not have them reused
+            if not self._probe_lock.acquire(blocking=False):
+                return False, "Read/write test failed: previous test still running (mount may be hung)"
+            
+            try:
+                # Write test, stamping a fresh nonce so stale data can never match
+                write_buf = self._probe_buf
+                read_buf = self._probe_read_buf
+                struct.pack_into('<Q', write_buf, 0, int(time.monotonic() * 1e9))
                 
-                if read_content != test_content:
-                    return False, "Read/write test failed: content mismatch"
+                # Write and read back through a single descriptor, bypassing the
+                # page cache so the data actually round-trips through the storage
+                try:
+                    fd = self._open_probe_file(test_file_path)
+                    try:
+                        os.write(fd, write_buf)
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                        
+                        # Read test
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        read_size = os.readv(fd, [read_buf])
+                    finally:
+                        os.close(fd)
+                except Exception:
+                    # Best-effort cleanup; probe names are unique, so a failed
+                    # probe would otherwise leave an orphaned file behind
+                    try:
+                        os.remove(test_file_path)
+                    except OSError:
+                        pass
+                    raise
                 
                 # Clean up
                 os.remove(test_file_path)
-            else:
-                self.log_and_print('info', f"DRY RUN: Would write/read test file '{test_file_path}'")
+                
+                if read_size != PROBE_BLOCK_SIZE or read_buf[:PROBE_NONCE_SIZE] != write_buf[:PROBE_NONCE_SIZE]:
+                    return False, "Read/write test failed: content mismatch"
+            finally:
+                self._probe_lock.release()
             
             return True, "Read/write test successful"
         except Exception as e:
             return False, f"Read/write test failed: {str(e)}"
     
+    def _rw_test_dryrun(self, mount_path):
+        """Report the read/write test that would be performed, without touching the mount."""
+        test_dir, test_file_path = self._probe_paths(mount_path)
+        
+        try:
+            if not os.path.exists(test_dir):
+                self.log_and_print('info', "DRY RUN: Would create directory '%s'", test_dir)
+            self.log_and_print('info', "DRY RUN: Would write/read test file '%s'", test_file_path)
+            
+            return True, "Read/write test successful"
+        except Exception as e:
+            return False, f"Read/write test failed: {str(e)}"
+    
+    def _open_probe_file(self, path):
+        """Open the probe file with O_DIRECT, or O_SYNC where the filesystem refuses it."""
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC
+        try:
+            return os.open(path, flags | os.O_DIRECT, 0o644)
+        except OSError as e:
+            # tmpfs and many FUSE filesystems reject O_DIRECT
+            if e.errno != errno.EINVAL:
+                raise
+        return os.open(path, flags | os.O_SYNC, 0o644)
     
     def check_critical_directories(self, mount_path):
         """Check if critical directories exist in the mount."""
-        critical_dirs = self.get_config_value('Advanced Settings', 'critical_directories', '')
-        
-        if not critical_dirs.strip():
+        if not self.critical_dirs_list:
             return True, "No critical directories configured"
         
+        # One readdir of the mount root instead of a stat per directory;
+        # nested entries (e.g. "Media/Movies") still need their own lookup.
+        # An unreadable or missing mount counts as every directory missing.
+        try:
+            with os.scandir(mount_path) as entries:
+                present = {entry.name for entry in entries}
+        except OSError:
+            present = set()
+        
         missing_dirs = []
-        for dir_name in [d.strip() for d in critical_dirs.split(',') if d.strip()]:
-            dir_path = os.path.join(mount_path, dir_name)
-            if not os.path.exists(dir_path):
+        for dir_name in self.critical_dirs_list:
+            name = dir_name.strip(os.sep)
+            if os.sep in name:
+                exists = os.path.exists(os.path.join(mount_path, name))
+            else:
+                exists = name in present
+            if not exists:
                 missing_dirs.append(dir_name)
         
         if missing_dirs:
@@ -210,8 +483,8 @@ class PlexMountHealthChecker:
     
     def check_mount_health(self):
         """Perform comprehensive mount health check."""
-        mount_path = self.get_config_value('Mount Settings', 'mount_path')
-        self.log_and_print('info', f"Starting mount health check for: {mount_path}")
+        mount_path = self.mount_path
+        self.log_and_print('info', "Starting mount health check for: %s", mount_path)
         
         checks = [
             ("Mount Existence", self.check_mount_exists),
@@ -223,105 +496,206 @@ class PlexMountHealthChecker:
         all_passed = True
         results = []
         
-        for check_name, check_func in checks:
-            try:
-                passed, message = check_func(mount_path)
-                results.append(f"{check_name}: {'PASS' if passed else 'FAIL'} - {message}")
-                
-                if passed:
-                    self.log_and_print('info', f"{check_name}: PASS - {message}")
-                else:
-                    self.log_and_print('error', f"{check_name}: FAIL - {message}")
-                    all_passed = False
-                    
-            except Exception as e:
-                error_msg = f"Exception during {check_name}: {str(e)}"
-                results.append(f"{check_name}: ERROR - {error_msg}")
-                self.log_and_print('error', error_msg)
+        # The checks are independent and I/O bound, so run them side by side.
+        # A check stuck on a hung mount is reported as failed instead of
+        # blocking the monitor, and is not started again until it returns.
+        started = time.monotonic()
+        self._mount_probe = self._start_task('Mount Probe', self._probe_mount, mount_path) or self._tasks['Mount Probe']
+        futures = [(check_name, self._start_task(check_name, self._run_timed_check, check_func, mount_path)) for check_name, check_func in checks]
+        deadline = started + self.mount_timeout
+        
+        for check_name, future in futures:
+            if future is None:
+                passed = False
+                message = f"{check_name} from a previous check is still running (mount may be hung)"
+                duration_ms = 0.0
+            else:
+                try:
+                    passed, message, duration_ms = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    passed = False
+                    message = f"{check_name} did not complete within {self.mount_timeout}s (mount may be hung)"
+                    duration_ms = (time.monotonic() - started) * 1000
+                except Exception as e:
+                    passed = False
+                    message = f"Exception during {check_name}: {str(e)}"
+                    duration_ms = (time.monotonic() - started) * 1000
+            
+            results.append({
+                'name': check_name,
+                'pass': passed,
+                'message': message,
+                'duration_ms': round(duration_ms, 1),
+            })
+            if not passed:
                 all_passed = False
         
+        # Checks run outside a cycle must take their own statvfs
+        self._mount_probe = None
+        
         return all_passed, results
     
+    def _start_task(self, name, func, *args):
+        """Run func on a daemon thread, returning a Future for its result.
+        
+        Returns None while the previous task of the same name is still running,
+        so calls stuck on a hung mount never pile up. Daemon threads also never
+        keep the process from exiting.
+        """
+        previous = self._tasks.get(name)
+        if previous is not None and not previous.done():
+            return None
+        
+        future = Future()
+        
+        def run():
+            try:
+                result = func(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        
+        self._tasks[name] = future
+        threading.Thread(target=run, name=f"PlexMountHealth {name}", daemon=True).start()
+        return future
+    
+    def _run_timed_check(self, check_func, mount_path):
+        """Run one check, returning (passed, message, duration in ms)."""
+        start = time.monotonic()
+        passed, message = check_func(mount_path)
+        return passed, message, (time.monotonic() - start) * 1000
+    
+    def _format_check_result(self, result):
+        """Render a check result dict as a single human-readable line."""
+        return f"{result['name']}: {'PASS' if result['pass'] else 'FAIL'} - {result['message']}"
+    
+    def _log_check_results(self, all_passed, results):
+        """Log a whole check cycle as a single record."""
+        level = logging.INFO if all_passed else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        if all_passed:
+            summary = "Mount health check PASSED"
+        else:
+            summary = f"Mount health check FAILED (failure #{self.consecutive_failures})"
+        details = "\n".join(f"  {self._format_check_result(result)}" for result in results)
+        
+        # The JSON log format writes the payload instead of the text message
+        payload = {
+            'mount': self.mount_path,
+            'pass': all_passed,
+            'checks': results,
+            'consecutive_failures': self.consecutive_failures,
+        }
+        self.logger.log(level, "%s\n%s", summary, details, extra={'payload': payload})
+    
     def should_send_email(self):
         """Check if we should send an email based on cooldown period."""
-        if not self.get_config_value('Email Settings', 'email_enabled', True, bool):
+        if not self.email_enabled:
             return False
         
-        email_cooldown = self.get_config_value('Script Behavior', 'email_cooldown', 3600, int)
-        
         if self.last_email_sent is None:
             return True
         
-        time_since_last = datetime.now() - self.last_email_sent
-        return time_since_last.total_seconds() >= email_cooldown
+        return (time.monotonic() - self.last_email_sent) >= self.email_cooldown
+    
+    def _send_email_disabled(self, subject, body, is_test=False):
+        """Stand-in for send_email_alert when email notifications are disabled."""
+        self.log_and_print('info', "Email notifications disabled")
+        return False
     
-    def send_email_alert(self, subject, body, is_test=False):
+    def _send_email_enabled(self, subject, body, is_test=False):
         """Send email alert about mount issues."""
-        if not self.get_config_value('Email Settings', 'email_enabled', True, bool):
-            self.log_and_print('info', "Email notifications disabled")
-            return False
-        
         if not is_test and not self.should_send_email():
             self.log_and_print('info', "Email cooldown period active, skipping email")
             return False
         
-        if self.get_config_value('Script Behavior', 'dry_run', False, bool):
-            self.log_and_print('info', f"DRY RUN: Would send email with subject '{subject}'")
+        if self.dry_run:
+            self.log_and_print('info', "DRY RUN: Would send email with subject '%s'", subject)
             return True
         
         try:
-            # Email configuration
-            smtp_server = self.get_config_value('Email Settings', 'smtp_server')
-            smtp_port = self.get_config_value('Email Settings', 'smtp_port', 587, int)
-            smtp_use_tls = self.get_config_value('Email Settings', 'smtp_use_tls', True, bool)
-            smtp_username = self.get_config_value('Email Settings', 'smtp_username')
-            
-            # Get password from file or config
-            smtp_password = self.get_email_password()
-            
-            from_email = self.get_config_value('Email Settings', 'from_email')
-            to_emails = self.get_config_value('Email Settings', 'to_emails')
-            subject_prefix = self.get_config_value('Email Settings', 'email_subject_prefix', '[Plex Mount Alert]')
-            
             # Create message
-            msg = MIMEMultipart()
-            msg['From'] = from_email
-            msg['To'] = to_emails
+            msg = EmailMessage()
+            msg['From'] = self.from_email
+            msg['To'] = self.to_emails
             
             # Use different prefix for test emails
             if is_test:
                 msg['Subject'] = f"[Plex Mount Test] {subject}"
             else:
-                msg['Subject'] = f"{subject_prefix} {subject}"
+                msg['Subject'] = f"{self.email_subject_prefix} {subject}"
+            msg['Date'] = formatdate(localtime=True)
             
             # Add timestamp and hostname to body
-            hostname = os.uname().nodename
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            full_body = f"Timestamp: {timestamp}\nHostname: {hostname}\n\n{body}"
-            
-            msg.attach(MIMEText(full_body, 'plain'))
+            msg.set_content(f"Timestamp: {timestamp}\nHostname: {self.hostname}\n\n{body}")
             
-            # Send email
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            if smtp_use_tls:
-                server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
-            server.quit()
+            # Send email, retrying once on a fresh connection if the cached one was dropped
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._close_smtp()
+                self._get_smtp().send_message(msg)
             
             if is_test:
-                self.last_test_email_sent = datetime.now()
-                self.log_and_print('info', f"Test email sent successfully to: {to_emails}")
+                self.last_test_email_sent = time.monotonic()
+                self.log_and_print('info', "Test email sent successfully to: %s", self.to_emails)
             else:
-                self.last_email_sent = datetime.now()
-                self.log_and_print('info', f"Email alert sent successfully to: {to_emails}")
+                self.last_email_sent = time.monotonic()
+                self.log_and_print('info', "Email alert sent successfully to: %s", self.to_emails)
+            self._save_state()
             return True
             
         except Exception as e:
             email_type = "test email" if is_test else "email alert"
-            self.log_and_print('error', f"Failed to send {email_type}: {str(e)}")
+            self.log_and_print('error', "Failed to send %s: %s", email_type, e)
             return False
     
+    def _get_smtp(self):
+        """Return a live, authenticated SMTP connection, reusing the cached one when possible."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        
+        # Email configuration
+        smtp_server = self.get_config_value('Email Settings', 'smtp_server')
+        smtp_port = self.get_config_value('Email Settings', 'smtp_port', 587, int)
+        smtp_use_tls = self.get_config_value('Email Settings', 'smtp_use_tls', True, bool)
+        smtp_username = self.get_config_value('Email Settings', 'smtp_username')
+        
+        # Get password from file or config
+        smtp_password = self.get_email_password()
+        
+        server = smtplib.SMTP(smtp_server, smtp_port, timeout=self.smtp_timeout)
+        try:
+            if smtp_use_tls:
+                server.starttls()
+            server.login(smtp_username, smtp_password)
+        except Exception:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        """Close the cached SMTP connection, if any."""
+        if self._smtp is None:
+            return
+        
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
     def get_email_password(self):
         """Get email password from file or config."""
         # Try password file first (recommended)
@@ -333,7 +707,7 @@ class PlexMountHealthChecker:
                 if password:
                     return password
             except Exception as e:
-                self.log_and_print('error', f"Failed to read password file '{password_file}': {e}")
+                self.log_and_print('error', "Failed to read password file '%s': %s", password_file, e)
         
         # Fallback to config file password
         return self.get_config_value('Email Settings', 'smtp_password', '', str)
@@ -353,21 +727,21 @@ class PlexMountHealthChecker:
             print(f"SMTP Server: {smtp_server}")
             print(f"SMTP Port: {smtp_port}")
             print(f"Use TLS: {smtp_use_tls}")
+            print(f"Timeout: {self.smtp_timeout}s")
             print(f"Username: {smtp_username}")
             print(f"Password: {'*' * len(smtp_password) if smtp_password else '(empty)'}")
             
             # Test connection
             print("\n1. Testing DNS resolution...")
-            import socket
             try:
-                ip = socket.gethostbyname(smtp_server)
-                print(f"   ✓ DNS resolved: {smtp_server} -> {ip}")
+                addr_info = socket.getaddrinfo(smtp_server, smtp_port, type=socket.SOCK_STREAM)
+                print(f"   ✓ DNS resolved: {smtp_server} -> {addr_info[0][4][0]}")
             except socket.gaierror as e:
                 print(f"   ✗ DNS resolution failed: {e}")
                 return False
             
             print("2. Testing SMTP connection...")
-            server = smtplib.SMTP(smtp_server, smtp_port)
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=self.smtp_timeout)
             print(f"   ✓ Connected to {smtp_server}:{smtp_port}")
             
             if smtp_use_tls:
@@ -402,16 +776,13 @@ class PlexMountHealthChecker:
     
     def should_send_periodic_test_email(self):
         """Check if we should send a periodic test email."""
-        test_interval_hours = self.get_config_value('Email Test Settings', 'test_email_interval_hours', 0, int)
-        
-        if test_interval_hours <= 0:
+        if self.test_email_interval_hours <= 0:
             return False
         
         if self.last_test_email_sent is None:
             return True
         
-        time_since_last = datetime.now() - self.last_test_email_sent
-        return time_since_last.total_seconds() >= (test_interval_hours * 3600)
+        return (time.monotonic() - self.last_test_email_sent) >= (self.test_email_interval_hours * 3600)
     
     def run_single_check(self):
         """Run a single health check and handle results."""
@@ -420,38 +791,43 @@ class PlexMountHealthChecker:
             
             if all_passed:
                 self.consecutive_failures = 0
-                self.log_and_print('info', "Mount health check PASSED")
+                self._log_check_results(all_passed, results)
                 return True
             else:
                 self.consecutive_failures += 1
-                max_failures = self.get_config_value('Script Behavior', 'max_failures', 3, int)
-                
-                self.log_and_print('warning', f"Mount health check FAILED (failure #{self.consecutive_failures})")
+                self._log_check_results(all_passed, results)
                 
                 # Send alert if we've reached the failure threshold
-                if self.consecutive_failures >= max_failures:
+                if self.consecutive_failures >= self.max_failures:
                     subject = f"Mount Health Check Failed ({self.consecutive_failures} consecutive failures)"
-                    body = "The following mount health checks failed:\n\n" + "\n".join(results)
+                    body = "The following mount health checks failed:\n\n" + "\n".join(
+                        self._format_check_result(result) for result in results
+                    )
                     self.send_email_alert(subject, body)
                 
                 return False
                 
         except Exception as e:
-            self.log_and_print('error', f"Unexpected error during health check: {str(e)}")
+            self.log_and_print('error', "Unexpected error during health check: %s", e)
             return False
+        finally:
+            self._save_state()
     
     def run_continuous(self):
         """Run continuous health checking with configured interval."""
-        check_interval = self.get_config_value('Mount Settings', 'check_interval', 300, int)
-        
-        self.log_and_print('info', f"Starting continuous mount health monitoring (interval: {check_interval}s)")
+        self.log_and_print('info', "Starting continuous mount health monitoring (interval: %ds)", self.check_interval)
         
         # Send startup test email if configured
-        if self.get_config_value('Email Test Settings', 'send_test_email_on_startup', False, bool):
+        if self.send_test_email_on_startup:
             self.log_and_print('info', "Sending startup test email...")
             self.send_test_email()
         
+        mount_watch, mountinfo = self._open_mount_watch()
+        
         try:
+            # Schedule checks on a fixed monotonic grid so the period does not
+            # stretch by the duration of each check
+            next_check = time.monotonic()
             while True:
                 self.run_single_check()
                 
@@ -460,12 +836,80 @@ class PlexMountHealthChecker:
                     self.log_and_print('info', "Sending periodic test email...")
                     self.send_test_email()
                 
-                time.sleep(check_interval)
+                next_check += self.check_interval
+                now = time.monotonic()
+                if now > next_check + self.check_interval:
+                    # Fell more than a full interval behind (slow checks, suspend);
+                    # resync instead of running the missed checks back to back
+                    self.log_and_print('warning', "Health check schedule fell behind by %.0fs, resyncing", now - next_check)
+                    next_check = now
+                self._wait_until(next_check, mount_watch)
         except KeyboardInterrupt:
             self.log_and_print('info', "Mount health monitoring stopped by user")
         except Exception as e:
-            self.log_and_print('error', f"Fatal error in continuous monitoring: {str(e)}")
+            self.log_and_print('error', "Fatal error in continuous monitoring: %s", e)
             sys.exit(1)
+        finally:
+            if mount_watch is not None:
+                mount_watch.close()
+                mountinfo.close()
+    
+    def _open_mount_watch(self):
+        """Watch the mount table for changes, returning (epoll, mountinfo file) or (None, None)."""
+        # The kernel flags /proc/self/mountinfo with POLLPRI|POLLERR whenever a
+        # filesystem is mounted or unmounted
+        try:
+            mountinfo = open('/proc/self/mountinfo', 'r')
+        except OSError as e:
+            self.log_and_print('warning', "Cannot watch mount table, relying on periodic checks only: %s", e)
+            return None, None
+        
+        mount_watch = select.epoll()
+        mount_watch.register(mountinfo.fileno(), select.EPOLLPRI | select.EPOLLERR)
+        return mount_watch, mountinfo
+    
+    def _wait_until(self, deadline, mount_watch):
+        """Sleep until the monotonic deadline, reacting to mount table changes meanwhile."""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            
+            if mount_watch is None:
+                time.sleep(remaining)
+                return
+            
+            if mount_watch.poll(remaining):
+                self._on_mount_table_change()
+    
+    def _on_mount_table_change(self):
+        """Re-check the mount right away when something is mounted or unmounted."""
+        # Bounded by mount_timeout like the regular checks, so a mount-table
+        # event can never freeze the loop on a hung mount
+        future = self._start_task('Mount Existence', self._run_timed_check, self.check_mount_exists, self.mount_path)
+        if future is None:
+            passed, message = False, "previous mount existence check is still running (mount may be hung)"
+        else:
+            try:
+                passed, message, _ = future.result(timeout=self.mount_timeout)
+            except FutureTimeoutError:
+                passed, message = False, f"did not complete within {self.mount_timeout}s (mount may be hung)"
+            except Exception as e:
+                passed, message = False, f"Exception during Mount Existence: {str(e)}"
+        
+        if passed:
+            self.log_and_print('debug', "Mount table changed, mount still present")
+            return
+        
+        # Only escalate when a healthy mount starts failing; while it is already
+        # failing, unrelated mount churn (containers, snaps, autofs) must not add
+        # extra counted failures and bypass the max_failures grace period
+        if self.consecutive_failures > 0:
+            self.log_and_print('debug', "Mount table changed, mount still failing: %s", message)
+            return
+        
+        self.log_and_print('warning', "Mount table changed and mount check failed: %s", message)
+        self.run_single_check()
 
 
 def main():